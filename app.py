@@ -8,29 +8,314 @@ import http.server
 import json
 import sqlite3
 import os
+import queue
+import select
+import threading
+import contextlib
+import functools
+import time
 import urllib.parse
+import urllib.request
 from datetime import datetime
 import hashlib
+import hmac
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the standard json module
+    orjson = None
 
 # Configuration
 PORT = 5000
 DB_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "doubt_tracker.db")
 STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "web")
-
-
-def get_db():
-    """Get a database connection."""
-    conn = sqlite3.connect(DB_FILE)
+READER_POOL_SIZE = 4
+STREAM_POOL_SIZE = 4  # readers kept apart for streamed responses
+READER_TIMEOUT = 5  # seconds a request may wait for a pooled reader before a 503
+VERIFY_CACHE_TTL = 300  # seconds a password check result may be reused
+WRITE_BATCH_MAX = 64  # most queued write jobs committed in one transaction
+WRITE_TIMEOUT = 5  # seconds a queued write may wait before it is cancelled
+OPTIMIZE_INTERVAL = 3600  # seconds between PRAGMA optimize runs on the writer
+RESULT_CACHE_TTL = 5  # seconds a cached dashboard response stays valid
+RESULT_CACHE_MAX = 1024
+KEEPALIVE_TIMEOUT = 15  # seconds an idle connection may hold a server thread
+STREAM_CHUNK_SIZE = 16384  # bytes buffered per chunk when streaming result sets
+
+# Static files preloaded at startup: {relative path: (body, etag)}.
+# Images are left out and sent straight from disk with sendfile(2) through
+# descriptors opened once at startup: {relative path: (fd, size, etag)}.
+# Every send passes an explicit offset, so threads never share a file position.
+# os.sendfile() and os.pread() are POSIX-only; elsewhere (Windows) images are
+# opened per request and copied through the socket file instead.
+HAVE_SENDFILE = hasattr(os, "sendfile")
+STATIC_CACHE = {}
+STATIC_FILES = {}
+CONTENT_TYPES = {
+    ".html": "text/html",
+    ".css": "text/css",
+    ".js": "application/javascript",
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".ico": "image/x-icon",
+}
+SENDFILE_EXTENSIONS = tuple(ext for ext, content_type in CONTENT_TYPES.items() if content_type.startswith("image/"))
+
+# Connection pool: a queue of read-only connections; the writer connection is
+# owned by the writer thread, which drains WRITE_Q in batched transactions.
+# Streamed responses hold their reader for the whole network transfer, so they
+# borrow from their own pool and slow clients cannot starve the other routes.
+_readers = queue.Queue()
+_stream_readers = queue.Queue()
+_writer_conn = None
+WRITE_Q = queue.Queue()
+# Guards each job's claimed/cancelled flags so a timed-out request and the
+# writer thread agree on whether the job runs
+_job_lock = threading.Lock()
+
+# Cached API responses: {(route, query, table generations): (expiry, payload)}.
+# Writes bump the generation of the tables they touch, which retires old keys.
+_result_cache = {}
+_table_generations = {"students": 0, "teachers": 0, "doubts": 0, "responses": 0}
+_generation_lock = threading.Lock()
+
+
+def get_db(read_only=False):
+    """Get a database connection.
+
+    Read-only connections open with mode=rw so a missing database fails
+    instead of being created. Each keeps a private page cache: a shared
+    cache would also share one WAL read snapshot across the pool.
+    """
+    uri = "file:" + urllib.request.pathname2url(DB_FILE)
+    uri += "?mode=rw" if read_only else "?mode=rwc"
+    conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA foreign_keys = ON")
+    conn.execute("PRAGMA busy_timeout = 30000")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute("PRAGMA mmap_size = 268435456")
+    conn.execute("PRAGMA cache_size = -20000")
+    if read_only:
+        conn.execute("PRAGMA query_only = 1")
     return conn
 
 
+def init_pool():
+    """Open the reader pool and start the writer thread."""
+    global _writer_conn
+    _writer_conn = get_db()
+    _writer_conn.isolation_level = None  # transactions are managed by _writer_loop
+    for _ in range(READER_POOL_SIZE):
+        _readers.put(get_db(read_only=True))
+    for _ in range(STREAM_POOL_SIZE):
+        _stream_readers.put(get_db(read_only=True))
+    threading.Thread(target=_writer_loop, name="db-writer", daemon=True).start()
+
+
+@contextlib.contextmanager
+def get_reader(pool=_readers):
+    """Borrow a read-only connection from pool.
+
+    Raises queue.Empty when none is returned within READER_TIMEOUT.
+    """
+    conn = pool.get(timeout=READER_TIMEOUT)
+    try:
+        yield conn
+    finally:
+        pool.put(conn)
+
+
+def with_reader(route):
+    """Pass a route a pooled reader, borrowed for the length of the call."""
+    @functools.wraps(route)
+    def wrapper(handler, query):
+        with get_reader() as conn:
+            return route(handler, query, conn)
+    return wrapper
+
+
+def _writer_loop():
+    """Commit queued write jobs, grouping whatever is waiting into one transaction."""
+    next_optimize = time.monotonic() + OPTIMIZE_INTERVAL
+    while True:
+        batch = [WRITE_Q.get()]
+        while len(batch) < WRITE_BATCH_MAX:
+            try:
+                batch.append(WRITE_Q.get_nowait())
+            except queue.Empty:
+                break
+
+        # Any exception (e.g. OverflowError binding a huge int) must fail only
+        # the jobs involved; the loop itself never exits
+        try:
+            _writer_conn.execute("BEGIN IMMEDIATE")
+            for job in batch:
+                with _job_lock:
+                    if job["cancelled"]:
+                        continue
+                    job["claimed"] = True
+                # A savepoint per job so one failing request doesn't undo the others
+                _writer_conn.execute("SAVEPOINT job")
+                try:
+                    for sql, params in job["statements"]:
+                        job["rows"] = _writer_conn.execute(sql, params).fetchall()
+                except Exception as e:
+                    _writer_conn.execute("ROLLBACK TO job")
+                    job["error"] = e
+                _writer_conn.execute("RELEASE job")
+            _writer_conn.execute("COMMIT")
+        except Exception as e:
+            try:
+                if _writer_conn.in_transaction:
+                    _writer_conn.execute("ROLLBACK")
+            except sqlite3.Error:
+                pass
+            for job in batch:
+                job["error"] = job["error"] or e
+        finally:
+            for job in batch:
+                job["done"].set()
+
+        # Keep planner statistics current as the tables grow
+        if time.monotonic() >= next_optimize:
+            try:
+                _writer_conn.execute("PRAGMA optimize")
+            except Exception:
+                pass
+            next_optimize = time.monotonic() + OPTIMIZE_INTERVAL
+
+
+def submit_write(*statements):
+    """Run (sql, params) statements atomically on the writer thread and wait for the commit.
+
+    Returns the rows produced by the last statement, e.g. from a RETURNING clause.
+    A job still queued after WRITE_TIMEOUT is cancelled, so a timeout always
+    means nothing was written; one the writer has already started is awaited.
+    """
+    job = {
+        "statements": statements, "done": threading.Event(), "error": None, "rows": [],
+        "claimed": False, "cancelled": False,
+    }
+    WRITE_Q.put(job)
+    if not job["done"].wait(WRITE_TIMEOUT):
+        with _job_lock:
+            if not job["claimed"]:
+                job["cancelled"] = True
+                raise TimeoutError("Write was not committed in time")
+        job["done"].wait()
+    if job["error"]:
+        raise job["error"]
+    return job["rows"]
+
+
+def invalidate(*tables):
+    """Retire cached responses that were built from any of the given tables."""
+    with _generation_lock:
+        for table in tables:
+            _table_generations[table] += 1
+
+
+def cached(tables, ttl=RESULT_CACHE_TTL):
+    """Cache a GET route's serialized response until ttl expires or a table changes.
+
+    The wrapped route returns its response data instead of sending it, or
+    returns None after sending an error response itself. A reader is only
+    borrowed on a miss, so hits are served even while the pool is busy.
+    """
+    def decorator(route):
+        @functools.wraps(route)
+        def wrapper(handler, query):
+            key = (
+                route.__name__,
+                tuple(sorted((k, tuple(v)) for k, v in query.items())),
+                tuple(_table_generations[t] for t in tables),
+            )
+            now = time.monotonic()
+            hit = _result_cache.get(key)
+            if hit and hit[0] > now:
+                handler.send_payload(hit[1])
+                return
+
+            with get_reader() as conn:
+                data = route(handler, query, conn)
+            if data is None:
+                return
+            payload = dumps_json(data)
+            if len(_result_cache) >= RESULT_CACHE_MAX:
+                for stale in [k for k, (expiry, _) in list(_result_cache.items()) if expiry <= now]:
+                    _result_cache.pop(stale, None)
+                if len(_result_cache) >= RESULT_CACHE_MAX:
+                    _result_cache.clear()
+            _result_cache[key] = (now + ttl, payload)
+            handler.send_payload(payload)
+        return wrapper
+    return decorator
+
+
+def dumps_json(data):
+    """Serialize a response payload to UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, default=str).encode("utf-8")
+
+
+def _password_digest(password):
+    return hashlib.sha256(password.encode("utf-8")).digest()
+
+
+def hash_password(password):
+    """Hash a password with scrypt for storage as 'scrypt$<salt>$<key>'."""
+    salt = os.urandom(16)
+    key = hashlib.scrypt(_password_digest(password), salt=salt, n=2**14, r=8, p=1)
+    return f"scrypt${salt.hex()}${key.hex()}"
+
+
+@functools.lru_cache(maxsize=1024)
+def _check_password(stored, digest, ttl_bucket):
+    """Run the KDF once per (stored hash, submitted digest) within a TTL window."""
+    _, salt, key = stored.split("$")
+    computed = hashlib.scrypt(digest, salt=bytes.fromhex(salt), n=2**14, r=8, p=1)
+    return hmac.compare_digest(computed, bytes.fromhex(key))
+
+
+def verify_password(password, stored):
+    """Check a submitted password against a stored scrypt hash."""
+    if not stored.startswith("scrypt$"):
+        return False
+    return _check_password(stored, _password_digest(password), int(time.monotonic() // VERIFY_CACHE_TTL))
+
+
+def load_static_cache():
+    """Preload STATIC_DIR: text files into STATIC_CACHE, images as open descriptors in STATIC_FILES."""
+    STATIC_CACHE.clear()
+    for fd, _, _ in STATIC_FILES.values():
+        os.close(fd)
+    STATIC_FILES.clear()
+    for root, _, files in os.walk(STATIC_DIR):
+        for name in files:
+            filepath = os.path.join(root, name)
+            relpath = os.path.relpath(filepath, STATIC_DIR).replace(os.sep, "/")
+            if name.lower().endswith(SENDFILE_EXTENSIONS):
+                if not HAVE_SENDFILE:
+                    continue
+                fd = os.open(filepath, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+                st = os.fstat(fd)
+                STATIC_FILES[relpath] = (fd, st.st_size, f'"{st.st_mtime_ns:x}-{st.st_size:x}"')
+                continue
+            with open(filepath, "rb") as f:
+                body = f.read()
+            STATIC_CACHE[relpath] = (body, '"' + hashlib.sha1(body).hexdigest() + '"')
+
+
 def init_db():
     """Initialize the database with tables and default data."""
     conn = get_db()
     cursor = conn.cursor()
 
+    # WAL lets readers proceed while a writer commits; it is persistent in the database file
+    cursor.execute("PRAGMA journal_mode = WAL")
+
     cursor.executescript("""
         CREATE TABLE IF NOT EXISTS students (
             student_id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -69,6 +354,11 @@ def init_db():
             FOREIGN KEY (doubt_id) REFERENCES doubts(doubt_id) ON DELETE CASCADE,
             FOREIGN KEY (teacher_id) REFERENCES teachers(teacher_id) ON DELETE CASCADE
         );
+
+        CREATE INDEX IF NOT EXISTS idx_doubts_student_status_created ON doubts(student_id, status, created_at DESC);
+        CREATE INDEX IF NOT EXISTS idx_doubts_status_created ON doubts(status, created_at DESC);
+        CREATE INDEX IF NOT EXISTS idx_responses_teacher ON responses(teacher_id);
+        CREATE INDEX IF NOT EXISTS idx_responses_doubt ON responses(doubt_id, response_date DESC);
     """)
 
     # Insert default admin if not exists
@@ -76,7 +366,7 @@ def init_db():
     if cursor.fetchone()[0] == 0:
         cursor.execute(
             "INSERT INTO teachers (name, subject, email, password, is_admin) VALUES (?, ?, ?, ?, ?)",
-            ("Admin", "All Subjects", "admin@doubttracker.com", "admin123", 1)
+            ("Admin", "All Subjects", "admin@doubttracker.com", hash_password("admin123"), 1)
         )
 
     # Insert default teacher if not exists
@@ -84,10 +374,19 @@ def init_db():
     if cursor.fetchone()[0] == 0:
         cursor.execute(
             "INSERT INTO teachers (name, subject, email, password, is_admin) VALUES (?, ?, ?, ?, ?)",
-            ("Dr. Sharma", "Mathematics", "sharma@doubttracker.com", "teacher123", 0)
+            ("Dr. Sharma", "Mathematics", "sharma@doubttracker.com", hash_password("teacher123"), 0)
         )
 
+    # Hash any passwords still stored in plaintext by older versions
+    for table, key in (("students", "student_id"), ("teachers", "teacher_id")):
+        rows = cursor.execute(f"SELECT {key}, password FROM {table} WHERE password NOT LIKE 'scrypt$%'").fetchall()
+        for row in rows:
+            cursor.execute(f"UPDATE {table} SET password = ? WHERE {key} = ?", (hash_password(row[1]), row[0]))
+
     conn.commit()
+
+    # Give the query planner row statistics for the indices
+    cursor.execute("ANALYZE")
     conn.close()
     print("Database initialized successfully.")
 
@@ -95,6 +394,12 @@ def init_db():
 class DoubtTrackerHandler(http.server.SimpleHTTPRequestHandler):
     """Custom HTTP request handler for the Doubt Tracker API."""
 
+    # Keep-alive: every response must carry a Content-Length
+    protocol_version = "HTTP/1.1"
+    # Idle keep-alive connections are closed after this many seconds
+    # instead of pinning their thread while blocked on the next request
+    timeout = KEEPALIVE_TIMEOUT
+
     def do_GET(self):
         parsed = urllib.parse.urlparse(self.path)
         path = parsed.path
@@ -102,20 +407,15 @@ class DoubtTrackerHandler(http.server.SimpleHTTPRequestHandler):
 
         # API routes
         if path.startswith("/api/"):
-            self.handle_api_get(path, query)
+            self.handle_api(GET_ROUTES, path, query)
         elif path == "/" or path == "":
             self.serve_file("index.html", "text/html")
-        elif path.endswith(".html"):
-            self.serve_file(path.lstrip("/"), "text/html")
-        elif path.endswith(".css"):
-            self.serve_file(path.lstrip("/"), "text/css")
-        elif path.endswith(".js"):
-            self.serve_file(path.lstrip("/"), "application/javascript")
-        elif path.endswith(".png") or path.endswith(".jpg") or path.endswith(".ico"):
-            content_type = "image/png" if path.endswith(".png") else "image/jpeg"
-            self.serve_file(path.lstrip("/"), content_type)
         else:
-            self.serve_file("index.html", "text/html")
+            content_type = CONTENT_TYPES.get(os.path.splitext(path)[1].lower())
+            if content_type:
+                self.serve_file(path.lstrip("/"), content_type)
+            else:
+                self.serve_file("index.html", "text/html")
 
     def do_POST(self):
         parsed = urllib.parse.urlparse(self.path)
@@ -129,246 +429,183 @@ class DoubtTrackerHandler(http.server.SimpleHTTPRequestHandler):
             self.send_json({"error": "Invalid JSON"}, 400)
             return
 
-        self.handle_api_post(path, data)
+        self.handle_api(POST_ROUTES, path, data)
 
     def send_json(self, data, status=200):
+        self.send_payload(dumps_json(data), status)
+
+    def send_payload(self, payload, status=200):
         self.send_response(status)
         self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def send_json_rows(self, rows):
+        """Stream rows as a JSON array with chunked encoding, without materializing the result."""
+        if self.request_version != "HTTP/1.1":
+            self.send_json([dict(r) for r in rows])
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Transfer-Encoding", "chunked")
         self.send_header("Access-Control-Allow-Origin", "*")
+        try:
+            self.end_headers()
+            buf = bytearray(b"[")
+            for i, row in enumerate(rows):
+                if i:
+                    buf += b","
+                buf += dumps_json(dict(row))
+                if len(buf) >= STREAM_CHUNK_SIZE:
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(buf), buf))
+                    buf = bytearray()
+            buf += b"]"
+            self.wfile.write(b"%x\r\n%s\r\n0\r\n\r\n" % (len(buf), buf))
+        except Exception:
+            # Headers are already sent, so no error response can follow; drop the
+            # connection so the client sees a truncated body
+            self.close_connection = True
+
+    def send_not_modified(self, etag):
+        """Answer with 304 if the client's If-None-Match covers etag."""
+        if_none_match = self.headers.get("If-None-Match")
+        if not if_none_match:
+            return False
+        if if_none_match.strip() != "*" and etag not in [t.strip() for t in if_none_match.split(",")]:
+            return False
+        self.send_response(304)
+        self.send_header("ETag", etag)
         self.end_headers()
-        self.wfile.write(json.dumps(data, default=str).encode("utf-8"))
+        return True
 
     def serve_file(self, filename, content_type):
+        if content_type.startswith("image/"):
+            self.sendfile(filename, content_type)
+            return
+
+        cached = STATIC_CACHE.get(filename)
+        if cached:
+            body, etag = cached
+            if self.send_not_modified(etag):
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type + "; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        # Files added after startup are read from disk until the next restart
         filepath = os.path.join(STATIC_DIR, filename)
         if os.path.exists(filepath):
+            with open(filepath, "rb") as f:
+                content = f.read()
             self.send_response(200)
             self.send_header("Content-Type", content_type + "; charset=utf-8")
+            self.send_header("Content-Length", str(len(content)))
             self.end_headers()
-            with open(filepath, "rb") as f:
-                self.wfile.write(f.read())
+            self.wfile.write(content)
         else:
-            self.send_response(404)
-            self.end_headers()
-            self.wfile.write(b"File not found")
-
-    # ==================== API GET Routes ====================
+            self.send_not_found()
+
+    def sendfile(self, filename, content_type):
+        """Send a binary file with sendfile(2), skipping the user-space copy."""
+        cached = STATIC_FILES.get(filename)
+        if cached:
+            fd, size, etag = cached
+            if self.send_file_headers(size, etag, content_type):
+                self.send_file_range(fd, size)
+            return
 
-    def handle_api_get(self, path, query):
-        conn = get_db()
         try:
-            if path == "/api/student/doubts":
-                student_id = query.get("student_id", [None])[0]
-                status_filter = query.get("status", ["All"])[0]
-                if not student_id:
-                    self.send_json({"error": "student_id required"}, 400)
-                    return
-                sql = "SELECT d.*, s.name as student_name FROM doubts d JOIN students s ON d.student_id = s.student_id WHERE d.student_id = ?"
-                params = [student_id]
-                if status_filter != "All":
-                    sql += " AND d.status = ?"
-                    params.append(status_filter)
-                sql += " ORDER BY d.created_at DESC"
-                rows = conn.execute(sql, params).fetchall()
-                self.send_json([dict(r) for r in rows])
-
-            elif path == "/api/student/stats":
-                student_id = query.get("student_id", [None])[0]
-                if not student_id:
-                    self.send_json({"error": "student_id required"}, 400)
-                    return
-                total = conn.execute("SELECT COUNT(*) as c FROM doubts WHERE student_id = ?", (student_id,)).fetchone()["c"]
-                pending = conn.execute("SELECT COUNT(*) as c FROM doubts WHERE student_id = ? AND status = 'Pending'", (student_id,)).fetchone()["c"]
-                resolved = conn.execute("SELECT COUNT(*) as c FROM doubts WHERE student_id = ? AND status = 'Resolved'", (student_id,)).fetchone()["c"]
-                self.send_json({"total": total, "pending": pending, "resolved": resolved})
-
-            elif path == "/api/teacher/doubts":
-                status_filter = query.get("status", ["All"])[0]
-                sql = "SELECT d.*, s.name as student_name FROM doubts d JOIN students s ON d.student_id = s.student_id"
-                params = []
-                if status_filter != "All":
-                    sql += " WHERE d.status = ?"
-                    params.append(status_filter)
-                sql += " ORDER BY d.created_at DESC"
-                rows = conn.execute(sql, params).fetchall()
-                self.send_json([dict(r) for r in rows])
-
-            elif path == "/api/teacher/stats":
-                teacher_id = query.get("teacher_id", [None])[0]
-                pending = conn.execute("SELECT COUNT(*) as c FROM doubts WHERE status = 'Pending'").fetchone()["c"]
-                in_progress = conn.execute("SELECT COUNT(*) as c FROM doubts WHERE status = 'In Progress'").fetchone()["c"]
-                resolved = conn.execute("SELECT COUNT(*) as c FROM doubts WHERE status = 'Resolved'").fetchone()["c"]
-                my_responses = 0
-                if teacher_id:
-                    my_responses = conn.execute("SELECT COUNT(*) as c FROM responses WHERE teacher_id = ?", (teacher_id,)).fetchone()["c"]
-                self.send_json({"pending": pending, "in_progress": in_progress, "resolved": resolved, "my_responses": my_responses})
-
-            elif path == "/api/doubt/details":
-                doubt_id = query.get("doubt_id", [None])[0]
-                if not doubt_id:
-                    self.send_json({"error": "doubt_id required"}, 400)
-                    return
-                doubt = conn.execute(
-                    "SELECT d.*, s.name as student_name FROM doubts d JOIN students s ON d.student_id = s.student_id WHERE d.doubt_id = ?",
-                    (doubt_id,)
-                ).fetchone()
-                if not doubt:
-                    self.send_json({"error": "Doubt not found"}, 404)
-                    return
-                responses = conn.execute(
-                    "SELECT r.*, t.name as teacher_name FROM responses r JOIN teachers t ON r.teacher_id = t.teacher_id WHERE r.doubt_id = ? ORDER BY r.response_date DESC",
-                    (doubt_id,)
-                ).fetchall()
-                self.send_json({"doubt": dict(doubt), "responses": [dict(r) for r in responses]})
-
-            elif path == "/api/admin/stats":
-                students = conn.execute("SELECT COUNT(*) as c FROM students").fetchone()["c"]
-                teachers = conn.execute("SELECT COUNT(*) as c FROM teachers").fetchone()["c"]
-                total_doubts = conn.execute("SELECT COUNT(*) as c FROM doubts").fetchone()["c"]
-                resolved = conn.execute("SELECT COUNT(*) as c FROM doubts WHERE status = 'Resolved'").fetchone()["c"]
-                pending = conn.execute("SELECT COUNT(*) as c FROM doubts WHERE status = 'Pending'").fetchone()["c"]
-                self.send_json({
-                    "students": students, "teachers": teachers,
-                    "total_doubts": total_doubts, "resolved": resolved, "pending": pending,
-                    "resolution_pct": round((resolved / total_doubts * 100) if total_doubts > 0 else 0)
-                })
-
-            elif path == "/api/admin/teachers":
-                rows = conn.execute("SELECT teacher_id, name, subject, email, is_admin FROM teachers ORDER BY teacher_id").fetchall()
-                self.send_json([dict(r) for r in rows])
-
-            elif path == "/api/admin/students":
-                rows = conn.execute(
-                    "SELECT s.*, (SELECT COUNT(*) FROM doubts d WHERE d.student_id = s.student_id) as doubt_count FROM students s ORDER BY s.student_id"
-                ).fetchall()
-                self.send_json([dict(r) for r in rows])
-
+            f = open(os.path.join(STATIC_DIR, filename), "rb")
+        except OSError:
+            self.send_not_found()
+            return
+        with f:
+            st = os.fstat(f.fileno())
+            if not self.send_file_headers(st.st_size, f'"{st.st_mtime_ns:x}-{st.st_size:x}"', content_type):
+                return
+            if HAVE_SENDFILE:
+                self.send_file_range(f.fileno(), st.st_size)
             else:
-                self.send_json({"error": "Unknown API endpoint"}, 404)
+                self.copyfile(f, self.wfile)
+
+    def send_file_headers(self, size, etag, content_type):
+        """Send the headers for a file body, or a 304; return whether the body should follow."""
+        if self.send_not_modified(etag):
+            return False
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(size))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        return True
+
+    def send_file_range(self, fd, size):
+        """Write size bytes of fd to the client, reading at explicit offsets.
+
+        os.sendfile() and os.pread() never touch the descriptor's file
+        position, so cached descriptors are safe to share across threads.
+        When sendfile(2) cannot be used on this socket the body is copied
+        with pread() instead. Only called when HAVE_SENDFILE is true.
+        """
+        sock = self.connection
+        offset = 0
+        try:
+            while offset < size:
+                try:
+                    sent = os.sendfile(sock.fileno(), fd, offset, size - offset)
+                except BlockingIOError:
+                    # The socket has a timeout, so it is non-blocking underneath
+                    if not select.select([], [sock], [], sock.gettimeout())[1]:
+                        raise TimeoutError("timed out sending file")
+                    continue
+                if sent == 0:
+                    break
+                offset += sent
+        except OSError as e:
+            if offset or isinstance(e, TimeoutError):
+                raise
+        while offset < size:
+            chunk = os.pread(fd, min(STREAM_CHUNK_SIZE, size - offset), offset)
+            if not chunk:
+                break
+            self.wfile.write(chunk)
+            offset += len(chunk)
+
+    def send_not_found(self):
+        self.send_response(404)
+        self.send_header("Content-Length", "14")
+        self.end_headers()
+        self.wfile.write(b"File not found")
 
-        except Exception as e:
-            self.send_json({"error": str(e)}, 500)
-        finally:
-            conn.close()
+    # ==================== API Dispatch ====================
 
-    # ==================== API POST Routes ====================
+    def handle_api(self, routes, path, params):
+        """Dispatch to the route registered for path with one dict lookup.
 
-    def handle_api_post(self, path, data):
-        conn = get_db()
+        GET routes receive the parsed query string and POST routes the JSON
+        body. Routes borrow a reader themselves, and only when they read.
+        """
+        route = routes.get(path)
+        if route is None:
+            self.send_json({"error": "Unknown API endpoint"}, 404)
+            return
         try:
-            if path == "/api/auth/login":
-                email = data.get("email", "").strip()
-                password = data.get("password", "")
-                role = data.get("role", "student")
-
-                if not email or not password:
-                    self.send_json({"error": "Email and password required"}, 400)
-                    return
-
-                if role == "student":
-                    user = conn.execute("SELECT student_id as id, name FROM students WHERE email = ? AND password = ?",
-                                       (email, password)).fetchone()
-                    if user:
-                        self.send_json({"success": True, "id": user["id"], "name": user["name"], "role": "student"})
-                    else:
-                        self.send_json({"error": "Invalid email or password"}, 401)
-                else:
-                    user = conn.execute("SELECT teacher_id as id, name, is_admin FROM teachers WHERE email = ? AND password = ?",
-                                       (email, password)).fetchone()
-                    if user:
-                        role_name = "admin" if user["is_admin"] else "teacher"
-                        self.send_json({"success": True, "id": user["id"], "name": user["name"], "role": role_name})
-                    else:
-                        self.send_json({"error": "Invalid email or password"}, 401)
-
-            elif path == "/api/auth/register":
-                name = data.get("name", "").strip()
-                email = data.get("email", "").strip()
-                password = data.get("password", "")
-
-                if not name or not email or not password:
-                    self.send_json({"error": "All fields are required"}, 400)
-                    return
-
-                existing = conn.execute("SELECT student_id FROM students WHERE email = ?", (email,)).fetchone()
-                if existing:
-                    self.send_json({"error": "An account with this email already exists"}, 409)
-                    return
-
-                conn.execute("INSERT INTO students (name, email, password) VALUES (?, ?, ?)",
-                             (name, email, password))
-                conn.commit()
-                self.send_json({"success": True, "message": "Account created successfully!"})
-
-            elif path == "/api/doubt/add":
-                student_id = data.get("student_id")
-                subject = data.get("subject", "").strip()
-                doubt_text = data.get("doubt_text", "").strip()
-
-                if not student_id or not subject or not doubt_text:
-                    self.send_json({"error": "All fields are required"}, 400)
-                    return
-
-                conn.execute("INSERT INTO doubts (student_id, subject, doubt_text) VALUES (?, ?, ?)",
-                             (student_id, subject, doubt_text))
-                conn.commit()
-                self.send_json({"success": True, "message": "Doubt submitted successfully!"})
-
-            elif path == "/api/doubt/respond":
-                doubt_id = data.get("doubt_id")
-                teacher_id = data.get("teacher_id")
-                response_text = data.get("response_text", "").strip()
-                new_status = data.get("status", "Resolved")
-
-                if not doubt_id or not teacher_id or not response_text:
-                    self.send_json({"error": "All fields are required"}, 400)
-                    return
-
-                conn.execute("INSERT INTO responses (doubt_id, teacher_id, response_text) VALUES (?, ?, ?)",
-                             (doubt_id, teacher_id, response_text))
-                conn.execute("UPDATE doubts SET status = ? WHERE doubt_id = ?", (new_status, doubt_id))
-                conn.commit()
-                self.send_json({"success": True, "message": "Response submitted!"})
-
-            elif path == "/api/admin/teacher/add":
-                name = data.get("name", "").strip()
-                subject = data.get("subject", "").strip()
-                email = data.get("email", "").strip()
-                password = data.get("password", "")
-
-                if not name or not subject or not email or not password:
-                    self.send_json({"error": "All fields are required"}, 400)
-                    return
-
-                existing = conn.execute("SELECT teacher_id FROM teachers WHERE email = ?", (email,)).fetchone()
-                if existing:
-                    self.send_json({"error": "Email already exists"}, 409)
-                    return
-
-                conn.execute("INSERT INTO teachers (name, subject, email, password) VALUES (?, ?, ?, ?)",
-                             (name, subject, email, password))
-                conn.commit()
-                self.send_json({"success": True, "message": "Teacher added!"})
-
-            elif path == "/api/admin/teacher/delete":
-                teacher_id = data.get("teacher_id")
-                if not teacher_id:
-                    self.send_json({"error": "teacher_id required"}, 400)
-                    return
-                teacher = conn.execute("SELECT is_admin FROM teachers WHERE teacher_id = ?", (teacher_id,)).fetchone()
-                if teacher and teacher["is_admin"]:
-                    self.send_json({"error": "Cannot delete admin account"}, 403)
-                    return
-                conn.execute("DELETE FROM teachers WHERE teacher_id = ? AND is_admin = 0", (teacher_id,))
-                conn.commit()
-                self.send_json({"success": True, "message": "Teacher deleted!"})
-
-            else:
-                self.send_json({"error": "Unknown API endpoint"}, 404)
-
+            route(self, params)
+        except queue.Empty:
+            self.send_json({"error": "Server busy, please retry"}, 503)
+        except ConnectionError:
+            # The client went away mid-response; there is no one left to answer
+            self.close_connection = True
         except Exception as e:
             self.send_json({"error": str(e)}, 500)
-        finally:
-            conn.close()
 
     def log_message(self, format, *args):
         """Custom log to show clean output."""
@@ -376,12 +613,295 @@ class DoubtTrackerHandler(http.server.SimpleHTTPRequestHandler):
             print(f"  API: {args[0]}")
 
 
+class DoubtTrackerServer(http.server.ThreadingHTTPServer):
+    """Threaded server with a listen backlog sized for bursts of submissions."""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+
+# ==================== SQL ====================
+
+# List views only show a preview of the doubt text; one character past the
+# 70 shown lets the client tell whether to add an ellipsis
+DOUBT_LIST_COLUMNS = "d.doubt_id, d.subject, substr(d.doubt_text, 1, 71) as doubt_preview, d.status, d.created_at"
+
+SQL_STUDENT_DOUBTS_ALL = (
+    "SELECT " + DOUBT_LIST_COLUMNS + " FROM doubts d "
+    "WHERE d.student_id = ? ORDER BY d.created_at DESC"
+)
+SQL_STUDENT_DOUBTS_FILTERED = (
+    "SELECT " + DOUBT_LIST_COLUMNS + " FROM doubts d "
+    "WHERE d.student_id = ? AND d.status = ? ORDER BY d.created_at DESC"
+)
+SQL_STUDENT_STATS = (
+    "SELECT COUNT(*) as total, COALESCE(SUM(status = 'Pending'), 0) as pending, "
+    "COALESCE(SUM(status = 'Resolved'), 0) as resolved FROM doubts WHERE student_id = ?"
+)
+SQL_TEACHER_DOUBTS_ALL = (
+    "SELECT " + DOUBT_LIST_COLUMNS + ", s.name as student_name FROM doubts d JOIN students s ON d.student_id = s.student_id "
+    "ORDER BY d.created_at DESC"
+)
+SQL_TEACHER_DOUBTS_FILTERED = (
+    "SELECT " + DOUBT_LIST_COLUMNS + ", s.name as student_name FROM doubts d JOIN students s ON d.student_id = s.student_id "
+    "WHERE d.status = ? ORDER BY d.created_at DESC"
+)
+SQL_TEACHER_STATS = (
+    "SELECT COALESCE(SUM(status = 'Pending'), 0) as pending, "
+    "COALESCE(SUM(status = 'In Progress'), 0) as in_progress, "
+    "COALESCE(SUM(status = 'Resolved'), 0) as resolved, "
+    "(SELECT COUNT(*) FROM responses WHERE teacher_id = ?) as my_responses FROM doubts"
+)
+SQL_DOUBT_DETAILS = (
+    "SELECT d.doubt_id, d.subject, d.doubt_text, d.status, d.created_at, s.name as student_name "
+    "FROM doubts d JOIN students s ON d.student_id = s.student_id WHERE d.doubt_id = ?"
+)
+SQL_DOUBT_RESPONSES = (
+    "SELECT r.response_id, r.response_text, r.response_date, t.name as teacher_name "
+    "FROM responses r JOIN teachers t ON r.teacher_id = t.teacher_id WHERE r.doubt_id = ? ORDER BY r.response_date DESC"
+)
+SQL_ADMIN_STATS = (
+    "SELECT (SELECT COUNT(*) FROM students) as students, (SELECT COUNT(*) FROM teachers) as teachers, "
+    "COUNT(*) as total_doubts, COALESCE(SUM(status = 'Resolved'), 0) as resolved, "
+    "COALESCE(SUM(status = 'Pending'), 0) as pending FROM doubts"
+)
+SQL_ADMIN_TEACHERS = "SELECT teacher_id, name, subject, email, is_admin FROM teachers ORDER BY teacher_id"
+SQL_ADMIN_STUDENTS = (
+    "SELECT s.student_id, s.name, s.email, s.created_at, "
+    "(SELECT COUNT(*) FROM doubts d WHERE d.student_id = s.student_id) as doubt_count FROM students s ORDER BY s.student_id"
+)
+
+SQL_LOGIN_STUDENT = "SELECT student_id as id, name, password FROM students WHERE email = ?"
+SQL_LOGIN_TEACHER = "SELECT teacher_id as id, name, is_admin, password FROM teachers WHERE email = ?"
+SQL_INSERT_STUDENT = (
+    "INSERT INTO students (name, email, password) VALUES (?, ?, ?) "
+    "ON CONFLICT(email) DO NOTHING RETURNING student_id"
+)
+SQL_INSERT_DOUBT = "INSERT INTO doubts (student_id, subject, doubt_text) VALUES (?, ?, ?)"
+SQL_INSERT_RESPONSE = "INSERT INTO responses (doubt_id, teacher_id, response_text) VALUES (?, ?, ?)"
+SQL_UPDATE_DOUBT_STATUS = "UPDATE doubts SET status = ? WHERE doubt_id = ?"
+SQL_INSERT_TEACHER = (
+    "INSERT INTO teachers (name, subject, email, password) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT(email) DO NOTHING RETURNING teacher_id"
+)
+SQL_TEACHER_IS_ADMIN = "SELECT is_admin FROM teachers WHERE teacher_id = ?"
+SQL_DELETE_TEACHER = "DELETE FROM teachers WHERE teacher_id = ? AND is_admin = 0"
+
+
+# ==================== API GET Routes ====================
+
+@with_reader
+def student_doubts(handler, query, conn):
+    student_id = query.get("student_id", [None])[0]
+    status_filter = query.get("status", ["All"])[0]
+    if not student_id:
+        handler.send_json({"error": "student_id required"}, 400)
+        return
+    if status_filter == "All":
+        rows = conn.execute(SQL_STUDENT_DOUBTS_ALL, (student_id,)).fetchall()
+    else:
+        rows = conn.execute(SQL_STUDENT_DOUBTS_FILTERED, (student_id, status_filter)).fetchall()
+    handler.send_json([dict(r) for r in rows])
+
+
+@cached(tables=("doubts",))
+def student_stats(handler, query, conn):
+    student_id = query.get("student_id", [None])[0]
+    if not student_id:
+        handler.send_json({"error": "student_id required"}, 400)
+        return None
+    return dict(conn.execute(SQL_STUDENT_STATS, (student_id,)).fetchone())
+
+
+def teacher_doubts(handler, query):
+    status_filter = query.get("status", ["All"])[0]
+    with get_reader(_stream_readers) as conn:
+        if status_filter == "All":
+            handler.send_json_rows(conn.execute(SQL_TEACHER_DOUBTS_ALL))
+        else:
+            handler.send_json_rows(conn.execute(SQL_TEACHER_DOUBTS_FILTERED, (status_filter,)))
+
+
+@cached(tables=("doubts", "responses"))
+def teacher_stats(handler, query, conn):
+    teacher_id = query.get("teacher_id", [None])[0]
+    # A missing teacher_id binds NULL, which matches no responses
+    return dict(conn.execute(SQL_TEACHER_STATS, (teacher_id or None,)).fetchone())
+
+
+@with_reader
+def doubt_details(handler, query, conn):
+    doubt_id = query.get("doubt_id", [None])[0]
+    if not doubt_id:
+        handler.send_json({"error": "doubt_id required"}, 400)
+        return
+    doubt = conn.execute(SQL_DOUBT_DETAILS, (doubt_id,)).fetchone()
+    if not doubt:
+        handler.send_json({"error": "Doubt not found"}, 404)
+        return
+    responses = conn.execute(SQL_DOUBT_RESPONSES, (doubt_id,)).fetchall()
+    handler.send_json({"doubt": dict(doubt), "responses": [dict(r) for r in responses]})
+
+
+@cached(tables=("students", "teachers", "doubts"))
+def admin_stats(handler, query, conn):
+    stats = dict(conn.execute(SQL_ADMIN_STATS).fetchone())
+    total_doubts, resolved = stats["total_doubts"], stats["resolved"]
+    stats["resolution_pct"] = round((resolved / total_doubts * 100) if total_doubts > 0 else 0)
+    return stats
+
+
+@with_reader
+def admin_teachers(handler, query, conn):
+    rows = conn.execute(SQL_ADMIN_TEACHERS).fetchall()
+    handler.send_json([dict(r) for r in rows])
+
+
+@cached(tables=("students", "doubts"))
+def admin_students(handler, query, conn):
+    rows = conn.execute(SQL_ADMIN_STUDENTS).fetchall()
+    return [dict(r) for r in rows]
+
+
+GET_ROUTES = {
+    "/api/student/doubts": student_doubts,
+    "/api/student/stats": student_stats,
+    "/api/teacher/doubts": teacher_doubts,
+    "/api/teacher/stats": teacher_stats,
+    "/api/doubt/details": doubt_details,
+    "/api/admin/stats": admin_stats,
+    "/api/admin/teachers": admin_teachers,
+    "/api/admin/students": admin_students,
+}
+
+
+# ==================== API POST Routes ====================
+
+def auth_login(handler, data):
+    email = data.get("email", "").strip()
+    password = data.get("password", "")
+    role = data.get("role", "student")
+
+    if not email or not password:
+        handler.send_json({"error": "Email and password required"}, 400)
+        return
+
+    if role == "student":
+        with get_reader() as conn:
+            user = conn.execute(SQL_LOGIN_STUDENT, (email,)).fetchone()
+        if user and verify_password(password, user["password"]):
+            handler.send_json({"success": True, "id": user["id"], "name": user["name"], "role": "student"})
+        else:
+            handler.send_json({"error": "Invalid email or password"}, 401)
+    else:
+        with get_reader() as conn:
+            user = conn.execute(SQL_LOGIN_TEACHER, (email,)).fetchone()
+        if user and verify_password(password, user["password"]):
+            role_name = "admin" if user["is_admin"] else "teacher"
+            handler.send_json({"success": True, "id": user["id"], "name": user["name"], "role": role_name})
+        else:
+            handler.send_json({"error": "Invalid email or password"}, 401)
+
+
+def auth_register(handler, data):
+    name = data.get("name", "").strip()
+    email = data.get("email", "").strip()
+    password = data.get("password", "")
+
+    if not name or not email or not password:
+        handler.send_json({"error": "All fields are required"}, 400)
+        return
+
+    # No row comes back when the email is already registered
+    if not submit_write((SQL_INSERT_STUDENT, (name, email, hash_password(password)))):
+        handler.send_json({"error": "An account with this email already exists"}, 409)
+        return
+    invalidate("students")
+    handler.send_json({"success": True, "message": "Account created successfully!"})
+
+
+def doubt_add(handler, data):
+    student_id = data.get("student_id")
+    subject = data.get("subject", "").strip()
+    doubt_text = data.get("doubt_text", "").strip()
+
+    if not student_id or not subject or not doubt_text:
+        handler.send_json({"error": "All fields are required"}, 400)
+        return
+
+    submit_write((SQL_INSERT_DOUBT, (student_id, subject, doubt_text)))
+    invalidate("doubts")
+    handler.send_json({"success": True, "message": "Doubt submitted successfully!"})
+
+
+def doubt_respond(handler, data):
+    doubt_id = data.get("doubt_id")
+    teacher_id = data.get("teacher_id")
+    response_text = data.get("response_text", "").strip()
+    new_status = data.get("status", "Resolved")
+
+    if not doubt_id or not teacher_id or not response_text:
+        handler.send_json({"error": "All fields are required"}, 400)
+        return
+
+    submit_write(
+        (SQL_INSERT_RESPONSE, (doubt_id, teacher_id, response_text)),
+        (SQL_UPDATE_DOUBT_STATUS, (new_status, doubt_id)),
+    )
+    invalidate("responses", "doubts")
+    handler.send_json({"success": True, "message": "Response submitted!"})
+
+
+def admin_teacher_add(handler, data):
+    name = data.get("name", "").strip()
+    subject = data.get("subject", "").strip()
+    email = data.get("email", "").strip()
+    password = data.get("password", "")
+
+    if not name or not subject or not email or not password:
+        handler.send_json({"error": "All fields are required"}, 400)
+        return
+
+    if not submit_write((SQL_INSERT_TEACHER, (name, subject, email, hash_password(password)))):
+        handler.send_json({"error": "Email already exists"}, 409)
+        return
+    invalidate("teachers")
+    handler.send_json({"success": True, "message": "Teacher added!"})
+
+
+def admin_teacher_delete(handler, data):
+    teacher_id = data.get("teacher_id")
+    if not teacher_id:
+        handler.send_json({"error": "teacher_id required"}, 400)
+        return
+    with get_reader() as conn:
+        teacher = conn.execute(SQL_TEACHER_IS_ADMIN, (teacher_id,)).fetchone()
+    if teacher and teacher["is_admin"]:
+        handler.send_json({"error": "Cannot delete admin account"}, 403)
+        return
+    submit_write((SQL_DELETE_TEACHER, (teacher_id,)))
+    invalidate("teachers", "responses")  # responses cascade with the teacher
+    handler.send_json({"success": True, "message": "Teacher deleted!"})
+
+
+POST_ROUTES = {
+    "/api/auth/login": auth_login,
+    "/api/auth/register": auth_register,
+    "/api/doubt/add": doubt_add,
+    "/api/doubt/respond": doubt_respond,
+    "/api/admin/teacher/add": admin_teacher_add,
+    "/api/admin/teacher/delete": admin_teacher_delete,
+}
+
+
 def main():
     init_db()
+    init_pool()
 
     os.makedirs(STATIC_DIR, exist_ok=True)
+    load_static_cache()
 
-    server = http.server.HTTPServer(("", PORT), DoubtTrackerHandler)
+    server = DoubtTrackerServer(("", PORT), DoubtTrackerHandler)
     print(f"\n{'='*52}")
     print(f"  Digital Doubt Tracker - Web Application")
     print(f"{'='*52}")
@@ -399,6 +919,7 @@ def main():
     except KeyboardInterrupt:
         print("\n  Server stopped.")
         server.server_close()
+        submit_write(("PRAGMA optimize", ()))
 
 
 if __name__ == "__main__":
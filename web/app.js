@@ -596,7 +596,7 @@ function renderDoubtsTable(doubts, clickable = false, showStudent = false) {
         const statusClass = d.status.toLowerCase().replace(' ', '-');
         const rowClass = clickable ? 'clickable-row' : '';
         const onclick = clickable ? `onclick="showDoubtDetail(${d.doubt_id})"` : '';
-        const text = d.doubt_text.length > 70 ? d.doubt_text.substring(0, 70) + '...' : d.doubt_text;
+        const text = d.doubt_preview.length > 70 ? d.doubt_preview.substring(0, 70) + '...' : d.doubt_preview;
 
         html += `<tr class="${rowClass}" ${onclick}>`;
         html += `<td>${d.doubt_id}</td>`;